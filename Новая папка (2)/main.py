@@ -7,8 +7,13 @@ GUI-приложение на tkinter для демонстрации работ
 - шифрование и расшифрование текста по нажатию кнопок.
 """
 
+import hashlib  # Хэш содержимого файла — ключ кэша датасетов
+import io  # Текстовый буфер для быстрой выгрузки DataFrame в строку
 import os  # Работа с путями к файлам и папкам
+import queue  # Передача датасетов из фонового потока в поток интерфейса
+import threading  # Фоновая предзагрузка датасетов при старте
 import tkinter as tk  
+from typing import Callable, Dict, Optional  # Аннотации типов
 from tkinter import ttk, messagebox  # Виджеты ttk и стандартные диалоговые окна
 import pandas as pd  # Чтение и обработка Excel-датасетов
 
@@ -18,6 +23,8 @@ from safer_cipher import encrypt_message, decrypt_message  # Импорт фун
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Папка, в которой хранятся тестовые Excel-датасеты
 DATASETS_DIR = os.path.join(BASE_DIR, "datasets")
+# Папка дискового кэша уже разобранных датасетов (parquet)
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
 
 # Словарь с «читаемыми» названиями датасетов и соответствующими именами файлов
 DATASETS = {
@@ -26,6 +33,88 @@ DATASETS = {
     "Тикеты ITSM (itsm_tickets)": "dataset_itsm_tickets.xlsx",
 }
 
+# Количество строк, показываемых в окне предпросмотра
+PREVIEW_ROWS = 10
+# Максимальное число строк датасета, копируемых в поле входного текста
+MAX_COPY_ROWS = 5000
+
+
+def _read_excel(path: str, nrows: Optional[int] = None) -> pd.DataFrame:
+    """Чтение Excel-файла быстрым движком calamine, при его отсутствии — движком по умолчанию."""
+    try:
+        return pd.read_excel(path, engine="calamine", nrows=nrows)
+    except (ImportError, ValueError):
+        # python-calamine не установлен или pandas не знает такого движка
+        return pd.read_excel(path, nrows=nrows)
+
+
+def _load_preview(path: str) -> pd.DataFrame:
+    """
+    Чтение только заголовка и первых PREVIEW_ROWS строк Excel-файла.
+    Без движка calamine pandas читает лист через openpyxl в режиме read_only
+    и останавливается после nrows строк, так что весь лист не разбирается.
+    """
+    return _read_excel(path, nrows=PREVIEW_ROWS)
+
+
+# Кэш полностью загруженных датасетов в памяти процесса: хэш файла -> DataFrame
+_DF_CACHE: Dict[str, pd.DataFrame] = {}
+
+
+def _file_hash(path: str) -> str:
+    """SHA-1 содержимого файла: при изменении файла кэш автоматически устаревает."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        # Читаем кусками, чтобы не держать весь файл в памяти
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_cached(digest: str) -> Optional[pd.DataFrame]:
+    """Поиск датасета в кэше: сначала в памяти, затем в parquet-файле на диске."""
+    df = _DF_CACHE.get(digest)
+    if df is not None:
+        return df
+
+    cache_path = os.path.join(CACHE_DIR, digest + ".parquet")
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        df = pd.read_parquet(cache_path)
+    except Exception:
+        # Повреждённый кэш или нет движка parquet — просто перечитаем Excel
+        return None
+    _DF_CACHE[digest] = df
+    return df
+
+
+def _load_full(path: str) -> pd.DataFrame:
+    """Полная загрузка датасета с использованием кэша по хэшу файла."""
+    digest = _file_hash(path)
+    df = _load_cached(digest)
+    if df is not None:
+        return df
+
+    df = _read_excel(path)
+    _DF_CACHE[digest] = df
+    cache_path = os.path.join(CACHE_DIR, digest + ".parquet")
+    # Пишем во временный файл и атомарно подменяем: параллельные загрузки
+    # одного датасета не оставят недописанный кэш
+    tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # Кэш на диске — лишь оптимизация (например, не установлен pyarrow);
+        # недописанный временный файл удаляем
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return df
+
 
 class CryptoApp(tk.Tk):
     """Главный класс GUI-приложения, наследуется от tk.Tk."""
@@ -40,8 +129,15 @@ class CryptoApp(tk.Tk):
         # Цвет фона для единообразного стиля
         self.configure(bg="#f5f5f5")
 
-        # Текущий загруженный датафрейм (датасет) хранится здесь
+        # Путь к выбранному Excel-файлу (для предпросмотра читаются только первые строки)
+        self.current_path = None
+        # Полностью загруженный датафрейм; читается лениво при копировании в текст
         self.current_df = None
+        # Очередь (вид, имя, DataFrame) от фонового потока предзагрузки:
+        # вид "preview" — первые строки, "full" — датасет целиком
+        self._prewarm_queue: "queue.Queue[tuple[str, str, pd.DataFrame]]" = queue.Queue()
+        # Очередь результатов криптооперации: (успех, результат или исключение)
+        self._crypto_queue: "queue.Queue[tuple[bool, object]]" = queue.Queue()
         # Вынесенная в отдельный метод сборка интерфейса
         self._build_ui()
 
@@ -178,7 +274,7 @@ class CryptoApp(tk.Tk):
         btn_frame.pack(fill=tk.X, padx=10, pady=10)
 
         # Кнопка запуска шифрования (использует encrypt_message)
-        btn_encrypt = tk.Button(
+        self.btn_encrypt = tk.Button(
             btn_frame,
             text="Зашифровать",
             command=self.on_encrypt,
@@ -186,10 +282,10 @@ class CryptoApp(tk.Tk):
             fg="white",
             width=20,
         )
-        btn_encrypt.pack(side=tk.LEFT)
+        self.btn_encrypt.pack(side=tk.LEFT)
 
         # Кнопка запуска расшифрования (использует decrypt_message)
-        btn_decrypt = tk.Button(
+        self.btn_decrypt = tk.Button(
             btn_frame,
             text="Расшифровать",
             command=self.on_decrypt,
@@ -197,7 +293,7 @@ class CryptoApp(tk.Tk):
             fg="white",
             width=20,
         )
-        btn_decrypt.pack(side=tk.LEFT, padx=10)
+        self.btn_decrypt.pack(side=tk.LEFT, padx=10)
 
         # Кнопка очистки обоих текстовых полей
         btn_clear = tk.Button(
@@ -221,11 +317,82 @@ class CryptoApp(tk.Tk):
         )
         status_bar.pack(fill=tk.X, side=tk.BOTTOM)
 
-        # Автоматически загружаем первый датасет при старте приложения
-        self.load_dataset()
+        # Первый датасет (и остальные — в кэш) загружаем в фоне, чтобы окно
+        # появилось сразу; пока показываем заглушку в предпросмотре
+        self._show_preview("Загрузка…")
+        self.status_var.set("Загрузка датасетов…")
+        self._prewarm_thread = threading.Thread(
+            target=self._prewarm_all, args=(self.dataset_var.get(),), daemon=True
+        )
+        self._prewarm_thread.start()
+        self.after(50, self._poll_prewarm)
 
     # --------- Работа с датасетами ---------
 
+    def _show_preview(self, text: str) -> None:
+        """Вывод текста в поле предпросмотра (только для чтения)."""
+        self.dataset_preview.configure(state="normal")
+        self.dataset_preview.delete("1.0", tk.END)
+        self.dataset_preview.insert(tk.END, text)
+        self.dataset_preview.configure(state="disabled")
+
+    def _prewarm_all(self, selected: str) -> None:
+        """
+        Фоновый поток: сначала быстрый предпросмотр выбранного датасета,
+        затем полная загрузка всех датасетов в кэш (память + parquet).
+        """
+        try:
+            df = _load_preview(os.path.join(DATASETS_DIR, DATASETS[selected]))
+        except Exception:
+            # Ошибку покажет обычная загрузка после завершения предзагрузки
+            pass
+        else:
+            self._prewarm_queue.put(("preview", selected, df))
+
+        for name, filename in DATASETS.items():
+            path = os.path.join(DATASETS_DIR, filename)
+            try:
+                df = _load_full(path)
+            except Exception:
+                # Ошибку покажет обычная загрузка, когда пользователь выберет датасет
+                continue
+            self._prewarm_queue.put(("full", name, df))
+
+    def _poll_prewarm(self) -> None:
+        """Приём предзагруженных датасетов в потоке интерфейса."""
+        while True:
+            try:
+                kind, name, df = self._prewarm_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "preview":
+                self._apply_preview(name, df)
+            else:
+                self._apply_df(name, df)
+
+        if self._prewarm_thread.is_alive() or not self._prewarm_queue.empty():
+            self.after(50, self._poll_prewarm)
+        elif self.current_path is None:
+            # Предзагрузка не дала выбранный датасет — загружаем обычным путём с выводом ошибки
+            self.load_dataset()
+
+    def _apply_preview(self, name: str, df: pd.DataFrame) -> None:
+        """Показ первых строк датасета, если пользователь ещё ничего не загрузил сам."""
+        if name != self.dataset_var.get() or self.current_path is not None:
+            return
+        self.current_path = os.path.join(DATASETS_DIR, DATASETS[name])
+        self._show_preview(df.to_string(index=False))
+        self.status_var.set(f"Загружен предпросмотр датасета '{name}'")
+
+    def _apply_df(self, name: str, df: pd.DataFrame) -> None:
+        """Показ предзагруженного датасета, если он выбран и ещё не загружен полностью."""
+        if name != self.dataset_var.get() or self.current_df is not None:
+            return
+        self.current_path = os.path.join(DATASETS_DIR, DATASETS[name])
+        self.current_df = df
+        self._show_preview(df.head(PREVIEW_ROWS).to_string(index=False))
+        self.status_var.set(f"Загружен датасет '{name}', строк: {len(df)}")
+
     def load_dataset(self) -> None:
         """Загрузка выбранного Excel-датасета и отображение первых строк в preview."""
         name = self.dataset_var.get()  # Человеко-читаемое имя набора
@@ -241,35 +408,53 @@ class CryptoApp(tk.Tk):
             return
 
         try:
-            # Читаем Excel-файл целиком в DataFrame
-            df = pd.read_excel(path)
-            self.current_df = df  # Сохраняем загруженный датасет в атрибут
-            # Берём первые 10 строк для отображения в окне предпросмотра
-            preview = df.head(10).to_string(index=False)
-            self.dataset_preview.configure(state="normal")
-            self.dataset_preview.delete("1.0", tk.END)
-            self.dataset_preview.insert(tk.END, preview)
-            self.dataset_preview.configure(state="disabled")
-            # В статусной строке показываем, сколько всего строк загружено
-            self.status_var.set(f"Загружен датасет '{name}', строк: {len(df)}")
+            self.current_path = path  # Запоминаем путь для полной загрузки по требованию
+            # Если датасет уже разбирался ранее, берём его из кэша целиком
+            self.current_df = _load_cached(_file_hash(path))
+            if self.current_df is not None:
+                df = self.current_df.head(PREVIEW_ROWS)
+            else:
+                # Иначе для предпросмотра читаем только первые строки Excel-файла
+                df = _load_preview(path)
+            self._show_preview(df.to_string(index=False))
+            if self.current_df is not None:
+                self.status_var.set(f"Загружен датасет '{name}', строк: {len(self.current_df)}")
+            else:
+                self.status_var.set(f"Загружен предпросмотр датасета '{name}'")
         except Exception as e:
             # При ошибке чтения файла выводим сообщение пользователю
             messagebox.showerror("Ошибка", f"Не удалось загрузить датасет: {e}")
             self.status_var.set("Ошибка загрузки датасета")
 
     def copy_dataset_to_text(self) -> None:
-        """Копировать весь текущий датасет в левое текстовое поле."""
-        # Если датасет ещё не загружен, предупреждаем пользователя
-        if self.current_df is None:
+        """Копировать текущий датасет (не более MAX_COPY_ROWS строк) в левое текстовое поле."""
+        # Если датасет ещё не выбран, предупреждаем пользователя
+        if self.current_path is None:
             messagebox.showwarning("Внимание", "Сначала загрузите датасет.")
             return
-        # Переводим DataFrame в строку в табличном формате
-        text = self.current_df.to_string(index=False)
+        # Полный датасет читаем только сейчас, когда он действительно нужен
+        if self.current_df is None:
+            try:
+                self.current_df = _load_full(self.current_path)
+            except Exception as e:
+                messagebox.showerror("Ошибка", f"Не удалось загрузить датасет: {e}")
+                self.status_var.set("Ошибка загрузки датасета")
+                return
+        # Переводим DataFrame в текст с разделителем-табуляцией: to_csv работает
+        # значительно быстрее to_string, а очень большие таблицы усекаются
+        df = self.current_df
+        buf = io.StringIO()
+        df.head(MAX_COPY_ROWS).to_csv(buf, index=False, sep="\t")
+        text = buf.getvalue()
+        if len(df) > MAX_COPY_ROWS:
+            text += f"... (+{len(df) - MAX_COPY_ROWS} строк не показано)"
         # Очищаем поле ввода и вставляем туда текстовую таблицу
         self.text_in.delete("1.0", tk.END)
         self.text_in.insert(tk.END, text)
         # Обновляем строку статуса
-        self.status_var.set("Датасет скопирован в поле входного текста")
+        self.status_var.set(
+            f"Датасет скопирован в поле входного текста, строк: {min(len(df), MAX_COPY_ROWS)} из {len(df)}"
+        )
 
     # --------- Криптооперации ---------
 
@@ -283,18 +468,11 @@ class CryptoApp(tk.Tk):
         if not key or not data:
             messagebox.showwarning("Внимание", "Введите ключ и текст для шифрования.")
             return
-        try:
-            # Вызов функции шифрования из модуля safer_cipher
-            result = encrypt_message(data, key)
-            # Очищаем правое поле и выводим туда шифртекст (Base64)
-            self.text_out.delete("1.0", tk.END)
-            self.text_out.insert(tk.END, result)
-            # Обновляем статус об успешном шифровании
-            self.status_var.set("Текст успешно зашифрован")
-        except Exception as e:
-            # В случае любой ошибки выводим окно с описанием
-            messagebox.showerror("Ошибка", f"Ошибка шифрования: {e}")
-            self.status_var.set("Ошибка шифрования")
+        # Шифрование (safer_cipher.encrypt_message) выполняется в фоновом потоке
+        self._run_crypto(
+            encrypt_message, data, key,
+            "Шифрование...", "Текст успешно зашифрован", "Ошибка шифрования",
+        )
 
     def on_decrypt(self) -> None:
         """Обработчик кнопки «Расшифровать»."""
@@ -309,18 +487,58 @@ class CryptoApp(tk.Tk):
                 "Введите ключ и зашифрованный текст (Base64).",
             )
             return
+        # Расшифрование (safer_cipher.decrypt_message) выполняется в фоновом потоке
+        self._run_crypto(
+            decrypt_message, data, key,
+            "Расшифрование...", "Текст успешно расшифрован", "Ошибка расшифрования",
+        )
+
+    def _run_crypto(
+        self,
+        func: Callable[[str, str], str],
+        data: str,
+        key: str,
+        progress_msg: str,
+        done_msg: str,
+        error_msg: str,
+    ) -> None:
+        """Запуск криптооперации в фоновом потоке; окно остаётся отзывчивым."""
+        # На время работы блокируем кнопки, чтобы не запускать операции параллельно
+        self.btn_encrypt.configure(state="disabled")
+        self.btn_decrypt.configure(state="disabled")
+        self.status_var.set(progress_msg)
+
+        def worker() -> None:
+            try:
+                self._crypto_queue.put((True, func(data, key)))
+            except Exception as e:
+                self._crypto_queue.put((False, e))
+
+        # Поток-демон не удерживает процесс после закрытия окна,
+        # даже если длинная операция ещё не завершилась
+        threading.Thread(target=worker, daemon=True).start()
+        # Результат забираем периодическим опросом из главного потока tkinter
+        self.after(50, self._poll_crypto, done_msg, error_msg)
+
+    def _poll_crypto(self, done_msg: str, error_msg: str) -> None:
+        """Проверка завершения фоновой операции и вывод результата в правое поле."""
         try:
-            # Попытка расшифровать данные через safer_cipher.decrypt_message
-            result = decrypt_message(data, key)
-            # Выводим результат в правое поле
-            self.text_out.delete("1.0", tk.END)
-            self.text_out.insert(tk.END, result)
-            # Сообщаем в строке статуса об успешном восстановлении текста
-            self.status_var.set("Текст успешно расшифрован")
-        except Exception as e:
+            ok, result = self._crypto_queue.get_nowait()
+        except queue.Empty:
+            self.after(50, self._poll_crypto, done_msg, error_msg)
+            return
+
+        self.btn_encrypt.configure(state="normal")
+        self.btn_decrypt.configure(state="normal")
+        if not ok:
             # При ошибке (неправильный Base64, неверный ключ и т.п.) выводим сообщение
-            messagebox.showerror("Ошибка", f"Ошибка расшифрования: {e}")
-            self.status_var.set("Ошибка расшифрования")
+            messagebox.showerror("Ошибка", f"{error_msg}: {result}")
+            self.status_var.set(error_msg)
+            return
+        # Очищаем правое поле и выводим туда результат
+        self.text_out.delete("1.0", tk.END)
+        self.text_out.insert(tk.END, result)
+        self.status_var.set(done_msg)
 
     def clear_texts(self) -> None:
         """Очистка обоих текстовых полей и сброс статуса."""
@@ -1,5 +1,30 @@
-import base64
-from typing import List
+import ctypes
+import functools
+import hmac
+import os
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import pybase64 as _b64  # SIMD-ускоренный Base64 с тем же API, что и base64
+except ImportError:
+    import base64 as _b64
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy модуль работает на чистом Python
+    np = None
+
+try:
+    import numba
+    from numba import njit, prange
+except ImportError:  # Numba необязательна: без неё используется NumPy/Python
+    njit = None
+else:
+    # prange-ядро, запущенное из фонового потока GUI под слоем потоков TBB,
+    # не даёт интерпретатору завершиться; если слой не задан явно
+    # (NUMBA_THREADING_LAYER), предпочитаем OpenMP и встроенный workqueue
+    if "NUMBA_THREADING_LAYER" not in os.environ:
+        numba.config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
 
 BLOCK_SIZE = 8  # 64 бита
 ROUNDS = 10     # рекомендуемое число раундов для варианта с 128-битным ключом
@@ -11,6 +36,7 @@ _LOG = [0] * 256
 
 def _init_tables() -> None:
     """Инициализация таблиц exp/log для операций SAFER-подобного шифра."""
+    global _EXP, _LOG
     # exp: 45^x (mod 257), 256 -> 0
     for i in range(256):
         y = pow(45, i, 257)
@@ -27,13 +53,11 @@ def _init_tables() -> None:
         _LOG[x] = i & 0xFF
     _LOG[0] = 128  # специальное значение, как в описании SAFER
 
-_init_tables()
-
-def _sbox_exp(x: int) -> int:
-    return _EXP[x & 0xFF]
+    # Готовые таблицы храним как bytes: 1 байт на элемент и быстрая индексация
+    _EXP = bytes(_EXP)
+    _LOG = bytes(_LOG)
 
-def _sbox_log(x: int) -> int:
-    return _LOG[x & 0xFF]
+_init_tables()
 
 # --- Вспомогательные функции ---
 
@@ -54,6 +78,9 @@ def _rotate_byte_left6(b: int) -> int:
     b &= 0xFF
     return ((b << 6) & 0xFF) | (b >> 2)
 
+# Таблица сдвига для всех 256 байтов: сдвиг всего состояния — один bytes.translate
+_ROT6 = bytes(_rotate_byte_left6(b) for b in range(256))
+
 def _generate_round_keys(master: bytes, rounds: int = ROUNDS) -> List[bytes]:
     """
     Генерация списка подключей из 128-битного ключа.
@@ -63,83 +90,248 @@ def _generate_round_keys(master: bytes, rounds: int = ROUNDS) -> List[bytes]:
     if len(master) != 16:
         raise ValueError("master key must be 16 bytes (128 бит).")
 
-    state = list(master)
+    state = bytes(master)
     round_keys: List[bytes] = []
 
     for _ in range(rounds):
-        round_keys.append(bytes(state[:8]))
-        state = [_rotate_byte_left6(b) for b in state]
+        round_keys.append(state[:8])
+        state = state.translate(_ROT6)
 
     return round_keys
 
-# --- Feistel-сети над блоком 64 бита ---
+RoundTables = tuple[bytes, bytes, bytes, bytes]
 
-def _split_block(block: bytes) -> tuple[bytes, bytes]:
-    if len(block) != BLOCK_SIZE:
-        raise ValueError("Block size must be 8 bytes")
-    return block[:4], block[4:]
+def _xor_identity(k: int) -> bytes:
+    """Последовательность b ^ k для всех b = 0..255."""
+    return bytes(b ^ k for b in range(256))
+
+def _generate_round_tables(round_keys: List[bytes]) -> Tuple[RoundTables, ...]:
+    """
+    Предвычисление раундовых таблиц подстановки.
+    Для каждого раунда и каждого из 4 байтов правой половины строится таблица
+    T[lane][b] = sbox(b ^ rk[lane]), объединяющая XOR с подключом и exp/log,
+    так что функция F сводится к четырём обращениям к таблицам.
+    """
+    tables = []
+
+    for rk in round_keys:
+        if len(rk) < 4:
+            raise ValueError("Round key must be at least 4 bytes")
+        # Чётные байты проходят через exp, нечётные — через log;
+        # сама подстановка выполняется одним вызовом bytes.translate на таблицу
+        tables.append((
+            _xor_identity(rk[0]).translate(_EXP),
+            _xor_identity(rk[1]).translate(_LOG),
+            _xor_identity(rk[2]).translate(_EXP),
+            _xor_identity(rk[3]).translate(_LOG),
+        ))
+
+    return tuple(tables)
+
+# --- Feistel-сети над блоком 64 бита ---
 
-def _join_block(left: bytes, right: bytes) -> bytes:
-    return left + right
+# Половины блока и сам блок внутри раундов хранятся как целые числа
+# (big-endian), чтобы XOR выполнялся одной операцией, а не побайтно.
 
-def _F(right: bytes, rk: bytes) -> bytes:
+def _F(right: int, tables: RoundTables) -> int:
     """
-    Раундовая функция F: XOR с подключом, нелинейность через exp/log,
+    Раундовая функция F над 32-битной половиной блока:
+    XOR с подключом и нелинейность через exp/log
+    (одним обращением к раундовой таблице на байт),
     затем простое PHT-подобное линейное перемешивание.
     """
-    if len(right) != 4:
-        raise ValueError("Right half must be 4 bytes")
-    if len(rk) < 4:
-        raise ValueError("Round key must be at least 4 bytes")
+    t0, t1, t2, t3 = tables
+    # Чётные байты (x0, x2) и нечётные (x1, x3) сразу укладываются
+    # на свои позиции в 32-битном слове
+    even = (t0[right >> 24] << 24) | (t2[(right >> 8) & 0xFF] << 8)
+    odd = (t1[(right >> 16) & 0xFF] << 16) | t3[right & 0xFF]
 
-    x = [(right[i] ^ rk[i]) & 0xFF for i in range(4)]
+    # PHT-подобное смешивание обеих пар байтов одновременно (SWAR):
+    # sums = (x0 + x1, x2 + x3) в нечётных позициях,
+    # 2 * x0 + x1 = x0 + (x0 + x1) — в чётных; переносы отсекаются масками
+    sums = ((even >> 8) + odd) & 0x00FF00FF
+    doubles = (even + (sums << 8)) & 0xFF00FF00
 
-    # SAFER-подобное применение exp/log попеременно
-    for i in range(4):
-        if i % 2 == 0:
-            x[i] = _sbox_exp(x[i])
-        else:
-            x[i] = _sbox_log(x[i])
+    return doubles | sums
+
+def _encrypt_block_int(block: int, round_tables: Sequence[RoundTables]) -> int:
+    left, right = block >> 32, block & 0xFFFFFFFF
+
+    for tables in round_tables:
+        left, right = right, left ^ _F(right, tables)
 
-    # PHT-подобное смешивание (по два байта)
-    y0 = (2 * x[0] + x[1]) & 0xFF
-    y1 = (x[0] + x[1]) & 0xFF
-    y2 = (2 * x[2] + x[3]) & 0xFF
-    y3 = (x[2] + x[3]) & 0xFF
+    return (left << 32) | right
 
-    return bytes([y0, y1, y2, y3])
+def _decrypt_block_int(block: int, round_tables: Sequence[RoundTables]) -> int:
+    left, right = block >> 32, block & 0xFFFFFFFF
 
-def encrypt_block(block: bytes, round_keys: List[bytes]) -> bytes:
+    for tables in reversed(round_tables):
+        left, right = right ^ _F(left, tables), left
+
+    return (left << 32) | right
+
+def encrypt_block(block: bytes, round_tables: Sequence[RoundTables]) -> bytes:
     """Шифрование одного 64-битного блока в сети Фейстеля."""
     if len(block) != BLOCK_SIZE:
         raise ValueError("Block must be 8 bytes")
-    left, right = _split_block(block)
-
-    for rk in round_keys:
-        F_out = _F(right, rk[:4])
-        left, right = right, bytes((l ^ f) & 0xFF for l, f in zip(left, F_out))
-
-    return _join_block(left, right)
+    value = _encrypt_block_int(int.from_bytes(block, "big"), round_tables)
+    return value.to_bytes(BLOCK_SIZE, "big")
 
-def decrypt_block(block: bytes, round_keys: List[bytes]) -> bytes:
+def decrypt_block(block: bytes, round_tables: Sequence[RoundTables]) -> bytes:
     """Расшифрование одного 64-битного блока (обратная сеть Фейстеля)."""
     if len(block) != BLOCK_SIZE:
         raise ValueError("Block must be 8 bytes")
-    left, right = _split_block(block)
+    value = _decrypt_block_int(int.from_bytes(block, "big"), round_tables)
+    return value.to_bytes(BLOCK_SIZE, "big")
+
+def _round_tables_np(round_tables: Sequence[RoundTables]) -> "np.ndarray":
+    """Раундовые таблицы в виде массива uint8 формы (ROUNDS, 4, 256)."""
+    raw = b"".join(b"".join(tables) for tables in round_tables)
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, 4, 256)
+
+def _F_np(right: "np.ndarray", tables: "np.ndarray") -> "np.ndarray":
+    """
+    Векторный вариант раундовой функции F для массива правых половин
+    формы (N, 4) и таблиц раунда формы (4, 256). Результат побайтно совпадает с _F.
+    """
+    x0 = tables[0, right[:, 0]].astype(np.uint16)
+    x1 = tables[1, right[:, 1]].astype(np.uint16)
+    x2 = tables[2, right[:, 2]].astype(np.uint16)
+    x3 = tables[3, right[:, 3]].astype(np.uint16)
+
+    y = np.empty_like(right)
+    y[:, 0] = (2 * x0 + x1) & 0xFF
+    y[:, 1] = (x0 + x1) & 0xFF
+    y[:, 2] = (2 * x2 + x3) & 0xFF
+    y[:, 3] = (x2 + x3) & 0xFF
+    return y
+
+def _decrypt_blocks_np(blocks: "np.ndarray", round_tables: "np.ndarray") -> "np.ndarray":
+    """Расшифрование сразу всех блоков массива формы (N, 8) без цикла по блокам."""
+    left, right = blocks[:, :4], blocks[:, 4:]
+
+    for tables in round_tables[::-1]:
+        left, right = right ^ _F_np(left, tables), left
+
+    return np.concatenate([left, right], axis=1)
+
+# --- JIT-компиляция режима CBC (Numba) ---
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _load_half_nb(buf, i):
+        return ((np.int64(buf[i]) << 24) | (np.int64(buf[i + 1]) << 16)
+                | (np.int64(buf[i + 2]) << 8) | np.int64(buf[i + 3]))
+
+    @njit(cache=True)
+    def _store_half_nb(buf, i, value):
+        buf[i] = (value >> 24) & 0xFF
+        buf[i + 1] = (value >> 16) & 0xFF
+        buf[i + 2] = (value >> 8) & 0xFF
+        buf[i + 3] = value & 0xFF
+
+    @njit(cache=True)
+    def _F_nb(right, tables):
+        x0 = np.int64(tables[0, (right >> 24) & 0xFF])
+        x1 = np.int64(tables[1, (right >> 16) & 0xFF])
+        x2 = np.int64(tables[2, (right >> 8) & 0xFF])
+        x3 = np.int64(tables[3, right & 0xFF])
+        return ((((2 * x0 + x1) & 0xFF) << 24) | (((x0 + x1) & 0xFF) << 16)
+                | (((2 * x2 + x3) & 0xFF) << 8) | ((x2 + x3) & 0xFF))
+
+    # nogil=True: ядра отпускают GIL, и фоновое шифрование в GUI
+    # не подвешивает поток интерфейса
+    @njit(cache=True, nogil=True)
+    def _cbc_encrypt_nb(data, iv, round_tables):
+        """CBC-шифрование всего буфера (длина кратна 8) одним скомпилированным циклом."""
+        out = np.empty_like(data)
+        prev_left = _load_half_nb(iv, 0)
+        prev_right = _load_half_nb(iv, 4)
+
+        for i in range(0, data.size, 8):
+            left = _load_half_nb(data, i) ^ prev_left
+            right = _load_half_nb(data, i + 4) ^ prev_right
+            for r in range(round_tables.shape[0]):
+                left, right = right, left ^ _F_nb(right, round_tables[r])
+            _store_half_nb(out, i, left)
+            _store_half_nb(out, i + 4, right)
+            prev_left, prev_right = left, right
+
+        return out
+
+    @njit(cache=True, parallel=True, nogil=True)
+    def _cbc_decrypt_nb(data, iv, round_tables):
+        """CBC-расшифрование: блоки независимы, поэтому цикл распараллелен (prange)."""
+        out = np.empty_like(data)
+
+        for b in prange(data.size // 8):
+            i = b * 8
+            left = _load_half_nb(data, i)
+            right = _load_half_nb(data, i + 4)
+            for r in range(round_tables.shape[0] - 1, -1, -1):
+                left, right = right ^ _F_nb(left, round_tables[r]), left
+            if b == 0:
+                prev_left = _load_half_nb(iv, 0)
+                prev_right = _load_half_nb(iv, 4)
+            else:
+                prev_left = _load_half_nb(data, i - 8)
+                prev_right = _load_half_nb(data, i - 4)
+            _store_half_nb(out, i, left ^ prev_left)
+            _store_half_nb(out, i + 4, right ^ prev_right)
+
+        return out
+
+# --- Скомпилированное ядро на C (safer_core.c, подключается через ctypes) ---
+
+_CORE_NAMES = ("safer_core.so", "safer_core.dll", "safer_core.dylib")
+
+def _load_core() -> Optional[ctypes.CDLL]:
+    """
+    Загрузка собранной библиотеки safer_core рядом с модулем.
+    Если библиотека не собрана (или нет NumPy), возвращается None
+    и используются реализации на Numba/NumPy/Python.
+    """
+    if np is None:
+        return None
 
-    for rk in reversed(round_keys):
-        F_out = _F(left, rk[:4])
-        left, right = bytes((r ^ f) & 0xFF for r, f in zip(right, F_out)), left
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in _CORE_NAMES:
+        path = os.path.join(base_dir, name)
+        if not os.path.exists(path):
+            continue
+        try:
+            lib = ctypes.CDLL(path)
+            buf = np.ctypeslib.ndpointer(np.uint8, flags="C_CONTIGUOUS")
+            for func in (lib.safer_cbc_encrypt, lib.safer_cbc_decrypt):
+                func.argtypes = [buf, buf, ctypes.c_size_t, buf, buf, ctypes.c_size_t]
+                func.restype = None
+        except (OSError, AttributeError):
+            # Файл не загружается или собран из другой версии без нужных функций
+            continue
+        return lib
 
-    return _join_block(left, right)
+    return None
+
+_core = _load_core()
 
 # --- Паддинг и режим CBC ---
 
-def _pkcs7_pad(data: bytes, block_size: int = BLOCK_SIZE) -> bytes:
+# Допустимые последовательности дополнения PKCS#7 для каждой длины 1..BLOCK_SIZE
+_PAD_PATTERNS = [b"", *(bytes((i,)) * i for i in range(1, BLOCK_SIZE + 1))]
+
+def _pkcs7_pad(data: bytes, block_size: int = BLOCK_SIZE) -> bytearray:
     pad_len = block_size - (len(data) % block_size)
     if pad_len == 0:
         pad_len = block_size
-    return data + bytes([pad_len]) * pad_len
+    # Результат пишется в заранее выделенный буфер без промежуточных копий
+    padded = bytearray(len(data) + pad_len)
+    padded[:len(data)] = data
+    if pad_len <= BLOCK_SIZE:
+        padded[len(data):] = _PAD_PATTERNS[pad_len]
+    else:
+        padded[len(data):] = bytes((pad_len,)) * pad_len
+    return padded
 
 def _pkcs7_unpad(data: bytes, block_size: int = BLOCK_SIZE) -> bytes:
     if not data or len(data) % block_size != 0:
@@ -147,17 +339,94 @@ def _pkcs7_unpad(data: bytes, block_size: int = BLOCK_SIZE) -> bytes:
     pad_len = data[-1]
     if pad_len < 1 or pad_len > block_size:
         raise ValueError("Invalid padding length")
-    if data[-pad_len:] != bytes([pad_len]) * pad_len:
+    if pad_len <= BLOCK_SIZE:
+        expected = _PAD_PATTERNS[pad_len]
+    else:
+        expected = bytes((pad_len,)) * pad_len
+    # Сравнение за постоянное время не раскрывает, в каком байте ошибка
+    if not hmac.compare_digest(data[-pad_len:], expected):
         raise ValueError("Invalid padding bytes")
     return data[:-pad_len]
 
+def _xor8(a: bytes, b: bytes) -> bytes:
+    """XOR двух 8-байтовых блоков одной целочисленной операцией вместо побайтного цикла."""
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(BLOCK_SIZE, "little")
+
+_IV_MASK = b"\xA5" * BLOCK_SIZE
+
 def _derive_iv(key: bytes) -> bytes:
     """
     Простая детерминированная генерация IV из ключа:
     первые 8 байт XOR с константой 0xA5. В реальных системах
     IV должен быть случайным.
     """
-    return bytes((b ^ 0xA5) & 0xFF for b in key[:BLOCK_SIZE])
+    return _xor8(key[:BLOCK_SIZE], _IV_MASK)
+
+def _cbc_encrypt(data: bytes, iv: bytes, round_tables: Sequence[RoundTables]) -> bytes:
+    """CBC-шифрование дополненных данных самой быстрой доступной реализацией."""
+    if _core is not None or njit is not None:
+        src = np.frombuffer(data, dtype=np.uint8)
+        iv_arr = np.frombuffer(iv, dtype=np.uint8)
+        tables = _round_tables_np(round_tables)
+        if _core is not None:
+            out = np.empty_like(src)
+            _core.safer_cbc_encrypt(src, out, len(data) // BLOCK_SIZE, iv_arr, tables, len(tables))
+        else:
+            out = _cbc_encrypt_nb(src, iv_arr, tables)
+        return out.tobytes()
+
+    prev = int.from_bytes(iv, "big")
+    # Выходной буфер выделяется один раз и заполняется по 8 байт
+    out = bytearray(len(data))
+
+    for i in range(0, len(data), BLOCK_SIZE):
+        block = int.from_bytes(data[i:i + BLOCK_SIZE], "big")
+        prev = _encrypt_block_int(block ^ prev, round_tables)
+        out[i:i + BLOCK_SIZE] = prev.to_bytes(BLOCK_SIZE, "big")
+
+    return bytes(out)
+
+def _cbc_decrypt(cipher: bytes, iv: bytes, round_tables: Sequence[RoundTables]) -> bytes:
+    """CBC-расшифрование (без снятия паддинга) самой быстрой доступной реализацией."""
+    if not cipher:
+        return b""
+
+    if np is not None:
+        src = np.frombuffer(cipher, dtype=np.uint8)
+        iv_arr = np.frombuffer(iv, dtype=np.uint8)
+        tables = _round_tables_np(round_tables)
+        if _core is not None:
+            out = np.empty_like(src)
+            _core.safer_cbc_decrypt(src, out, len(cipher) // BLOCK_SIZE, iv_arr, tables, len(tables))
+            return out.tobytes()
+        if njit is not None:
+            return _cbc_decrypt_nb(src, iv_arr, tables).tobytes()
+        # CBC-расшифрование не зависит от предыдущих открытых блоков,
+        # поэтому все блоки обрабатываются одной векторной операцией
+        blocks = src.reshape(-1, BLOCK_SIZE)
+        prev = np.concatenate([iv_arr[None], blocks[:-1]])
+        return (_decrypt_blocks_np(blocks, tables) ^ prev).tobytes()
+
+    # Блоки расшифровываются независимо друг от друга, а CBC-XOR
+    # с предыдущими блоками шифртекста выполняется одной операцией над всем буфером
+    decrypted = b"".join(
+        _decrypt_block_int(int.from_bytes(cipher[i:i + BLOCK_SIZE], "big"), round_tables)
+        .to_bytes(BLOCK_SIZE, "big")
+        for i in range(0, len(cipher), BLOCK_SIZE)
+    )
+    prev = iv + cipher[:-BLOCK_SIZE]
+    data = int.from_bytes(decrypted, "big") ^ int.from_bytes(prev, "big")
+    return data.to_bytes(len(cipher), "big")
+
+@functools.lru_cache(maxsize=8)
+def _prepare(key_str: str, rounds: int) -> Tuple[Tuple[RoundTables, ...], bytes]:
+    """
+    Подготовка раундовых таблиц и IV по строковому ключу.
+    Результат кэшируется: в GUI ключ обычно не меняется между операциями.
+    """
+    master = _derive_key(key_str)
+    round_keys = _generate_round_keys(master, rounds)
+    return _generate_round_tables(round_keys), _derive_iv(master)
 
 # --- Публичные функции шифрования / расшифрования сообщения ---
 
@@ -166,49 +435,30 @@ def encrypt_message(plaintext: str, key_str: str, rounds: int = ROUNDS) -> str:
     Шифрует произвольную текстовую строку.
     :return: base64-строка, включающая IV + шифртекст.
     """
-    master = _derive_key(key_str)
-    round_keys = _generate_round_keys(master, rounds)
-    iv = _derive_iv(master)
+    round_tables, iv = _prepare(key_str, rounds)
 
     data = _pkcs7_pad(plaintext.encode("utf-8"), BLOCK_SIZE)
-    prev = iv
-    chunks = []
-
-    for i in range(0, len(data), BLOCK_SIZE):
-        block = data[i:i + BLOCK_SIZE]
-        xored = bytes(b ^ p for b, p in zip(block, prev))
-        cblock = encrypt_block(xored, round_keys)
-        chunks.append(cblock)
-        prev = cblock
 
-    result = iv + b"".join(chunks)
-    return base64.b64encode(result).decode("ascii")
+    result = iv + _cbc_encrypt(data, iv, round_tables)
+    return _b64.b64encode(result).decode("ascii")
 
 def decrypt_message(ciphertext_b64: str, key_str: str, rounds: int = ROUNDS) -> str:
     """
     Расшифровывает base64-строку, полученную из encrypt_message.
     :return: исходный текст (UTF-8).
     """
-    raw = base64.b64decode(ciphertext_b64.encode("ascii"))
+    raw = _b64.b64decode(ciphertext_b64.encode("ascii"))
     if len(raw) < BLOCK_SIZE:
         raise ValueError("Ciphertext too short")
 
     iv = raw[:BLOCK_SIZE]
     cipher = raw[BLOCK_SIZE:]
 
-    master = _derive_key(key_str)
-    round_keys = _generate_round_keys(master, rounds)
-
-    prev = iv
-    chunks = []
+    if len(cipher) % BLOCK_SIZE != 0:
+        raise ValueError("Ciphertext length must be a multiple of 8 bytes")
 
-    for i in range(0, len(cipher), BLOCK_SIZE):
-        block = cipher[i:i + BLOCK_SIZE]
-        dblock = decrypt_block(block, round_keys)
-        pblock = bytes(b ^ p for b, p in zip(dblock, prev))
-        chunks.append(pblock)
-        prev = block
+    round_tables, _ = _prepare(key_str, rounds)
 
-    data = b"".join(chunks)
+    data = _cbc_decrypt(cipher, iv, round_tables)
     data = _pkcs7_unpad(data, BLOCK_SIZE)
     return data.decode("utf-8")